@@ -2,84 +2,166 @@
 Cocotb testbench for safe_dial module with mod_barrett
 """
 
+import logging
+import os
+
 import cocotb
-from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, ClockCycles
+import numpy as np
+from cocotb.triggers import RisingEdge, ClockCycles, ReadOnly
+
+# Apply rotations one at a time from Python instead of streaming them
+DEBUG_ROTATIONS = os.environ.get("DEBUG_ROTATIONS", "0") == "1"
+
+# Control bits of the wrapper's packed ctrl_i port, above {direction, distance}
+CTRL_RST = 1 << 34
+CTRL_START = 1 << 33
+
+# Number of positions on the dial, fixed by mod_barrett
+DIAL_SIZE = 100
+
+# Position the dial points at after reset, matching the wrapper's DIAL_START
+DIAL_START = 50
+
+# Puzzle input next to this file, resolved once at import
+INPUT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "input.txt")
 
 
 async def reset_dut(dut):
     """Apply reset to the DUT"""
-    dut.rst_i.value = 1
-    dut.direction_i.value = 0
-    dut.distance_i.value = 0
-    await ClockCycles(dut.clk_i, 5)
-    dut.rst_i.value = 0
-    await RisingEdge(dut.clk_i)
+    dut.ctrl_i.value = CTRL_RST
+    await ClockCycles(dut.clk, 5)
+    dut.ctrl_i.value = 0
+    await RisingEdge(dut.clk)
 
 
-async def apply_rotation(dut, direction: str, distance: int):
-    """Apply a rotation to the dial. Module processes every clock cycle."""
-    dut.direction_i.value = 1 if direction == 'R' else 0
-    dut.distance_i.value = distance
-    await RisingEdge(dut.clk_i)
+async def stream_rotations(dut, words: list[int]):
+    """Preload all rotations into the wrapper memory and apply them in one burst.
 
+    Memory writes happen without awaiting, so the whole file costs a single
+    start pulse and one trigger on done_o instead of one trigger per rotation.
+    """
+    rotations_mem = dut.rotations_mem
+    for i in range(len(words)):
+        rotations_mem[i].value = words[i]
+    dut.count_i.value = len(words)
+    dut.ctrl_i.value = CTRL_START
+    await RisingEdge(dut.clk)
+    dut.ctrl_i.value = 0
+    await RisingEdge(dut.done_o)
+    await ReadOnly()
+
+
+def parse_rotations(input_file: str) -> tuple[np.ndarray, np.ndarray]:
+    """Parse the input file into direction and distance arrays.
+
+    The file is read in one go and split on whitespace; directions and
+    distances are then converted as whole arrays rather than line by line.
+    Directions are encoded like the DUT's direction_i (0=Left, 1=Right).
+    """
+    with open(input_file, "rb") as f:
+        tokens = f.read().split()
+    first_chars = np.frombuffer(b"".join(token[:1] for token in tokens), dtype=np.uint8)
+    directions = (first_chars == ord("R")).astype(np.int8)
+    distances = np.array([token[1:] for token in tokens]).astype(np.int32)
+    return directions, distances
+
+
+def pack_rotations(directions: np.ndarray, distances: np.ndarray) -> list[int]:
+    """Pack each rotation into its {direction, distance} word as a plain int.
+
+    The same words fill rotations_mem and drive ctrl_i in debug mode. They
+    are built once, so the hot loops only hand ready-made Python ints to
+    cocotb.
+    """
+    return ((directions.astype(np.int64) << 32) | distances).tolist()
+
+
+def rotate_left(current: int, reduced_distance: int) -> int:
+    """Calculate new position after a left rotation.
+
+    The distance must already be reduced modulo DIAL_SIZE (done once for the
+    whole input), which keeps the unwrapped position within one DIAL_SIZE of
+    the valid range, so a single conditional add wraps it.
+    """
+    new_pos = current - reduced_distance
+    return new_pos + DIAL_SIZE if new_pos < 0 else new_pos
 
-def calculate_position(current: int, direction: str, distance: int, dial_size: int = 100) -> int:
-    """Calculate new position after rotation using Python modulo."""
-    if direction == 'L':
-        new_pos = (current - distance) % dial_size
-    else:
-        new_pos = (current + distance) % dial_size
-    return new_pos
+
+def rotate_right(current: int, reduced_distance: int) -> int:
+    """Calculate new position after a right rotation (see rotate_left)."""
+    new_pos = current + reduced_distance
+    return new_pos - DIAL_SIZE if new_pos >= DIAL_SIZE else new_pos
+
+
+# Position update indexed by direction (0=Left, 1=Right), so the per-rotation
+# model needs neither a direction branch nor a dial_size argument
+ROTATE = (rotate_left, rotate_right)
+
+
+def reference_model(directions: np.ndarray, distances: np.ndarray) -> tuple[int, int]:
+    """Return the final position and number of landings on 0 using NumPy.
+
+    The position after every rotation is the running sum of signed distances
+    modulo DIAL_SIZE, so the whole trajectory is one cumsum instead of a
+    Python loop over the rotations.
+    """
+    steps = np.where(directions == 1, distances, -distances).astype(np.int64)
+    positions = (DIAL_START + np.cumsum(steps)) % DIAL_SIZE
+    final_position = int((DIAL_START + steps.sum()) % DIAL_SIZE)
+    return final_position, int((positions == 0).sum())
 
 
 @cocotb.test()
 async def test_input_file(dut):
     """Test with input.txt file and verify zero count"""
-    clock = Clock(dut.clk_i, 10, unit="ns")
-    cocotb.start_soon(clock.start())
-    
     # Read input file
-    import os
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    input_file = os.path.join(script_dir, "input.txt")
-    
-    rotations = []
-    with open(input_file, "r") as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                direction = line[0]
-                distance = int(line[1:])
-                rotations.append((direction, distance))
+    directions, distances = parse_rotations(INPUT_FILE)
+    words = pack_rotations(directions, distances)
+    num_rotations = len(words)
     
-    dut._log.info("=" * 60)
-    dut._log.info(f"Processing {len(rotations)} rotations from input.txt")
-    dut._log.info("=" * 60)
+    separator = "=" * 60
+    dut._log.info(f"{separator}\nProcessing {num_rotations} rotations from input.txt\n{separator}")
     
     # Apply reset and record start time
     await reset_dut(dut)
     start_time_ns = cocotb.utils.get_sim_time(unit='ns')
     start_cycle = start_time_ns / 10
     
-    # Calculate expected result with Python
-    python_position = 50
-    python_zero_count = 0
-    for direction, distance in rotations:
-        python_position = calculate_position(python_position, direction, distance)
-        if python_position == 0:
-            python_zero_count += 1
-    
-    # Apply all rotations to RTL
-    for i, (direction, distance) in enumerate(rotations):
-        await apply_rotation(dut, direction, distance)
+    if DEBUG_ROTATIONS:
+        # Apply rotations one at a time, computing each expected position just
+        # before the rotation is driven, so the rotations are walked only once
+        python_position = DIAL_START
+        python_zero_count = 0
         
-        if (i + 1) % 1000 == 0:
-            current_zeros = int(dut.zero_count_o.value)
-            dut._log.info(f"Progress: {i+1}/{len(rotations)} rotations, RTL zeros: {current_zeros}")
-    
-    # Wait one more cycle to get final result
-    await RisingEdge(dut.clk_i)
+        # Buffer progress messages and emit them once after the loop
+        log_progress = dut._log.isEnabledFor(logging.INFO)
+        progress_lines = []
+        # Resolve handles and the trigger once rather than every iteration
+        clk_edge = RisingEdge(dut.clk)
+        ctrl_sig = dut.ctrl_i
+        # Reduce all distances once so the loop needs no modulo
+        reduced_distances = (distances % DIAL_SIZE).tolist()
+        for i, (direction, reduced_distance, word) in enumerate(zip(directions.tolist(), reduced_distances, words)):
+            python_position = ROTATE[direction](python_position, reduced_distance)
+            python_zero_count += python_position == 0
+            
+            # Module processes one rotation every clock cycle
+            ctrl_sig.value = word
+            await clk_edge
+            
+            if log_progress and (i + 1) % 1000 == 0:
+                current_zeros = int(dut.zero_count_o.value)
+                progress_lines.append(f"Progress: {i+1}/{num_rotations} rotations, RTL zeros: {current_zeros}")
+        
+        # Let the last rotation settle; values are stable in the read-only phase
+        await ReadOnly()
+        
+        if progress_lines:
+            dut._log.info("\n".join(progress_lines))
+    else:
+        # Calculate expected result with Python, then apply all rotations to RTL
+        python_position, python_zero_count = reference_model(directions, distances)
+        await stream_rotations(dut, words)
     
     # Record end time
     end_time_ns = cocotb.utils.get_sim_time(unit='ns')
@@ -92,26 +174,27 @@ async def test_input_file(dut):
     # Get final results from RTL
     rtl_zero_count = int(dut.zero_count_o.value)
     
-    dut._log.info("=" * 60)
-    dut._log.info(f"RESULTS after {len(rotations)} rotations:")
-    dut._log.info(f"  Python: position={python_position}, zeros={python_zero_count}")
-    dut._log.info(f"  RTL:    zeros={rtl_zero_count}")
-    dut._log.info("=" * 60)
-    dut._log.info(f"LATENCY METRICS:")
-    dut._log.info(f"  Computation latency: {latency_cycles} clock cycles ({latency_ns} ns)")
-    dut._log.info(f"  Throughput: {len(rotations)} rotations / {latency_cycles} cycles")
-    dut._log.info(f"  Cycles per rotation: {latency_cycles / len(rotations):.2f}")
-    dut._log.info("=" * 60)
+    dut._log.info("\n".join([
+        separator,
+        f"RESULTS after {num_rotations} rotations:",
+        f"  Python: position={python_position}, zeros={python_zero_count}",
+        f"  RTL:    zeros={rtl_zero_count}",
+        separator,
+        f"LATENCY METRICS:",
+        f"  Computation latency: {latency_cycles} clock cycles ({latency_ns} ns)",
+        f"  Throughput: {num_rotations} rotations / {latency_cycles} cycles",
+        f"  Cycles per rotation: {latency_cycles / num_rotations:.2f}",
+        separator,
+    ]))
     
     # Print to make it easy to see in output
-    separator = "=" * 60
     print(f"\n{separator}")
     print(f"ANSWER: The dial landed on position 0 exactly {rtl_zero_count} times")
     print(f"Python reference: {python_zero_count} zeros")
     print(f"{separator}")
     print(f"LATENCY: {latency_cycles} clock cycles ({latency_ns} ns)")
-    print(f"  - Total rotations: {len(rotations)}")
-    print(f"  - Cycles per rotation: {latency_cycles / len(rotations):.2f}")
+    print(f"  - Total rotations: {num_rotations}")
+    print(f"  - Cycles per rotation: {latency_cycles / num_rotations:.2f}")
     print(f"  - Clock period: 10 ns (100 MHz)")
     print(f"{separator}\n")
     
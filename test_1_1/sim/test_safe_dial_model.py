@@ -0,0 +1,84 @@
+"""
+Plain pytest checks of the safe_dial Python reference model (no simulator).
+
+reference_model is vectorized with NumPy; these tests compare it against the
+scalar ROTATE helpers and a click-by-click walk of the dial, so a model bug
+shows up here rather than as an RTL mismatch.
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from test_safe_dial import (DIAL_SIZE, DIAL_START, INPUT_FILE, ROTATE,
+                            parse_rotations, reference_model)
+
+# Hand-picked sequences: distance 0, multiples of DIAL_SIZE, and rotations
+# that start from position 0 (L50 lands on 0 from DIAL_START)
+EDGE_CASES = [
+    [(0, 0)],
+    [(1, 0), (0, 0)],
+    [(0, 50)],
+    [(0, 50), (1, 0), (0, 0)],
+    [(0, 50), (1, 100), (0, 200)],
+    [(0, 50), (1, 1), (0, 1), (0, 99)],
+    [(1, 50), (1, 250), (0, 1000)],
+    [(1, 100), (0, 300), (1, 49), (1, 1)],
+]
+
+
+def walk_model(directions: list[int], distances: list[int]) -> tuple[int, int]:
+    """Turn the dial one click at a time, counting landings on 0."""
+    position = DIAL_START
+    zero_count = 0
+    for direction, distance in zip(directions, distances):
+        step = 1 if direction == 1 else -1
+        for _ in range(distance):
+            position = (position + step) % DIAL_SIZE
+        zero_count += position == 0
+    return position, zero_count
+
+
+def scalar_model(directions: list[int], distances: list[int]) -> tuple[int, int]:
+    """Apply the ROTATE helpers the debug loop uses, one rotation at a time."""
+    position = DIAL_START
+    zero_count = 0
+    for direction, distance in zip(directions, distances):
+        position = ROTATE[direction](position, distance % DIAL_SIZE)
+        zero_count += position == 0
+    return position, zero_count
+
+
+def random_rotations(rng: random.Random, count: int) -> list[tuple[int, int]]:
+    """Draw rotations biased towards 0 and multiples of DIAL_SIZE."""
+    return [(rng.randint(0, 1),
+             rng.choice([0, DIAL_SIZE * rng.randint(1, 5),
+                         rng.randint(1, DIAL_SIZE - 1), rng.randint(0, 1000)]))
+            for _ in range(count)]
+
+
+def check_models(rotations: list[tuple[int, int]]):
+    directions = [direction for direction, _ in rotations]
+    distances = [distance for _, distance in rotations]
+    expected = walk_model(directions, distances)
+    assert scalar_model(directions, distances) == expected
+    assert reference_model(np.array(directions, dtype=np.int8),
+                           np.array(distances, dtype=np.int32)) == expected
+
+
+@pytest.mark.parametrize("rotations", EDGE_CASES)
+def test_edge_cases(rotations: list[tuple[int, int]]):
+    check_models(rotations)
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_random_rotations(seed: int):
+    rng = random.Random(seed)
+    check_models(random_rotations(rng, rng.randint(1, 200)))
+
+
+def test_input_file():
+    directions, distances = parse_rotations(INPUT_FILE)
+    expected = scalar_model(directions.tolist(), distances.tolist())
+    assert reference_model(directions, distances) == expected == (47, 1180)
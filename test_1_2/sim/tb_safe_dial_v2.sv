@@ -0,0 +1,124 @@
+//------------------------------------------------------------------------------
+// Description:
+//   Simulation wrapper around safe_dial_v2. The testbench preloads all
+//   rotations into rotations_mem, sets count_i and pulses start. The wrapper
+//   then feeds one rotation per clock cycle into the DUT and raises done_o once
+//   the last rotation has been registered. This replaces one Python/simulator
+//   round trip per rotation with a single trigger for the whole input file.
+//
+//   While idle, the DUT is driven directly from the direction/distance fields
+//   of ctrl_i so rotations can still be applied one at a time from the
+//   testbench. Reset, start and the idle rotation share the one ctrl_i port
+//   so each of them is a single write from Python.
+//
+//   The clock (internal signal clk) is generated here rather than from
+//   Python, so the simulator does not hand control back to cocotb on every
+//   clock edge. Delays use the 1ns time unit set by the cocotb makefiles.
+//
+// Parameters:
+//   DIAL_SIZE     - Number of positions on the dial (default: 100)
+//   DIAL_START    - Starting position on the dial (default: 50)
+//   MAX_ROTATIONS - Depth of the rotation memory (default: 8192)
+//   CLK_PERIOD_NS - Clock period in ns (default: 10)
+//
+// Ports:
+//   ctrl_i       - Packed {ctrl_rst, ctrl_start, idle_direction, idle_distance}:
+//                    [34]   ctrl_rst       - Synchronous reset (active high)
+//                    [33]   ctrl_start     - Start streaming count_i rotations
+//                    [32]   idle_direction - Rotation direction while idle (0=Left, 1=Right)
+//                    [31:0] idle_distance  - Rotation distance while idle
+//   count_i      - Number of rotations to stream
+//   done_o       - Set once all streamed rotations have been applied
+//   zero_count_o - Number of times dial passed through 0
+//------------------------------------------------------------------------------
+
+module tb_safe_dial_v2 #(
+  parameter int DIAL_SIZE = 100,
+  parameter int DIAL_START = 50,
+  parameter int MAX_ROTATIONS = 8192,
+  parameter int CLK_PERIOD_NS = 10
+) (
+  input  logic [34:0] ctrl_i,
+  input  logic [31:0] count_i,
+  output logic        done_o,
+  output logic [31:0] zero_count_o
+);
+
+//----------------------------------------------------------------------------
+// Internal parameters
+//----------------------------------------------------------------------------
+localparam int ADDR_WIDTH = $clog2(MAX_ROTATIONS);
+
+//----------------------------------------------------------------------------
+// Internal signals
+//----------------------------------------------------------------------------
+logic        clk;
+logic        ctrl_rst;
+logic        ctrl_start;
+logic        idle_direction;
+logic [31:0] idle_distance;
+
+// Each entry holds {direction, distance}, written directly by the testbench
+logic [32:0] rotations_mem [MAX_ROTATIONS];
+
+logic        busy_q;
+logic [31:0] index_q;
+logic        dut_direction;
+logic [31:0] dut_distance;
+
+assign {ctrl_rst, ctrl_start, idle_direction, idle_distance} = ctrl_i;
+
+//----------------------------------------------------------------------------
+// Clock generation
+//----------------------------------------------------------------------------
+initial clk = 1'b0;
+always #(CLK_PERIOD_NS / 2.0) clk = ~clk;
+
+//----------------------------------------------------------------------------
+// DUT
+//----------------------------------------------------------------------------
+safe_dial_v2 #(
+  .DIAL_SIZE  (DIAL_SIZE),
+  .DIAL_START (DIAL_START)
+) inst_safe_dial_v2 (
+  .clk_i        (clk),
+  .rst_i        (ctrl_rst),
+  .direction_i  (dut_direction),
+  .distance_i   (dut_distance),
+  .zero_count_o (zero_count_o)
+);
+
+//----------------------------------------------------------------------------
+// Combinatorial process
+//----------------------------------------------------------------------------
+always_comb begin
+  if (busy_q) begin
+    {dut_direction, dut_distance} = rotations_mem[index_q[ADDR_WIDTH-1:0]];
+  end else begin
+    dut_direction = idle_direction;
+    dut_distance  = idle_distance;
+  end
+end
+
+//----------------------------------------------------------------------------
+// Sequential process
+//----------------------------------------------------------------------------
+always_ff @(posedge clk) begin
+  if (ctrl_rst) begin
+    busy_q  <= 1'b0;
+    index_q <= '0;
+    done_o  <= 1'b0;
+  end else if (busy_q) begin
+    index_q <= index_q + 32'd1;
+    if (index_q == count_i - 32'd1) begin
+      busy_q <= 1'b0;
+      done_o <= 1'b1;
+    end
+  end else if (ctrl_start) begin
+    busy_q  <= (count_i != '0);
+    index_q <= '0;
+    done_o  <= (count_i == '0);
+  end
+end
+
+endmodule
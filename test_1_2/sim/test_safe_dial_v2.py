@@ -3,18 +3,35 @@ Cocotb testbench for safe_dial_v2 - validates RTL against Python reference model
 """
 
 import cocotb
-from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, Timer
+import logging
+import numpy as np
+from cocotb.triggers import RisingEdge, ReadOnly
 import os
 
+# Apply rotations one at a time from Python instead of streaming them
+DEBUG_ROTATIONS = os.environ.get("DEBUG_ROTATIONS", "0") == "1"
 
-def count_zeros_during_rotation(position, direction, distance, dial_size=100):
-    """Count how many times we pass through 0 during a rotation."""
+# Control bits of the wrapper's packed ctrl_i port, above {direction, distance}
+CTRL_RST = 1 << 34
+CTRL_START = 1 << 33
+
+# Number of positions on the dial, fixed by mod_barrett
+DIAL_SIZE = 100
+
+# Position the dial points at after reset, matching the wrapper's DIAL_START
+DIAL_START = 50
+
+# Puzzle input next to this file, resolved once at import
+INPUT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "input.txt")
+
+
+def count_zeros_during_rotation(position, direction, distance, dial_size=DIAL_SIZE):
+    """Count how many times we pass through 0 during a rotation (direction: 0=Left, 1=Right)."""
     if distance == 0:
         return 0
     
     count = 0
-    if direction == 'R':
+    if direction == 1:
         if position == 0:
             count = distance // dial_size
         else:
@@ -22,7 +39,7 @@ def count_zeros_during_rotation(position, direction, distance, dial_size=100):
             if distance >= steps_to_first_zero:
                 remaining = distance - steps_to_first_zero
                 count = 1 + (remaining // dial_size)
-    else:  # direction == 'L'
+    else:  # direction == 0 (Left)
         if position == 0:
             count = distance // dial_size
         else:
@@ -34,97 +51,249 @@ def count_zeros_during_rotation(position, direction, distance, dial_size=100):
     return count
 
 
-def calculate_position(position, direction, distance, dial_size=100):
-    """Calculate new position after rotation."""
-    if direction == 'R':
-        return (position + distance) % dial_size
-    else:  # direction == 'L'
-        return (position - distance) % dial_size
+# Zeros passed for every (direction, position, distance % DIAL_SIZE). Each
+# further DIAL_SIZE of distance is a full turn that passes 0 exactly once more.
+ZEROS_LUT = [[[count_zeros_during_rotation(position, direction, distance, DIAL_SIZE)
+               for distance in range(DIAL_SIZE)]
+              for position in range(DIAL_SIZE)]
+             for direction in (0, 1)]
+
+
+def rotate_left(position, reduced_distance):
+    """Calculate new position after a left rotation.
+
+    The distance must already be reduced modulo DIAL_SIZE, so the unwrapped
+    position is at most one DIAL_SIZE out of range and a single conditional
+    add wraps it.
+    """
+    new_position = position - reduced_distance
+    return new_position + DIAL_SIZE if new_position < 0 else new_position
+
+
+def rotate_right(position, reduced_distance):
+    """Calculate new position after a right rotation (see rotate_left)."""
+    new_position = position + reduced_distance
+    return new_position - DIAL_SIZE if new_position >= DIAL_SIZE else new_position
+
+
+# Position update indexed by direction (0=Left, 1=Right)
+ROTATE = (rotate_left, rotate_right)
+
+
+def parse_rotations(input_file):
+    """Parse the input file into direction (0=Left, 1=Right) and distance arrays."""
+    with open(input_file, "rb") as f:
+        tokens = f.read().split()
+    first_chars = np.frombuffer(b"".join(token[:1] for token in tokens), dtype=np.uint8)
+    directions = (first_chars == ord("R")).astype(np.int8)
+    distances = np.array([token[1:] for token in tokens]).astype(np.int32)
+    return directions, distances
+
+
+def pack_rotations(directions, distances):
+    """Pack each rotation into its {direction, distance} word as a plain int.
+
+    The same words fill rotations_mem and drive ctrl_i in debug mode.
+    """
+    return ((directions.astype(np.int64) << 32) | distances).tolist()
+
+
+def run_reference(directions, full_turns, reduced_distances):
+    """Run the scalar model over all rotations once, before touching the RTL.
+
+    full_turns and reduced_distances are each distance's quotient and remainder
+    by DIAL_SIZE, split once for the whole input. Returns per-rotation lists of
+    the expected position and running zero count, so the per-rotation RTL loop
+    only has to index into them.
+    """
+    positions = []
+    zero_counts = []
+    position = DIAL_START
+    zeros = 0
+    for i in range(len(directions)):
+        direction = directions[i]
+        reduced_distance = reduced_distances[i]
+        zeros += full_turns[i] + ZEROS_LUT[direction][position][reduced_distance]
+        position = ROTATE[direction](position, reduced_distance)
+        positions.append(position)
+        zero_counts.append(zeros)
+    return positions, zero_counts
+
+
+def reference_model(directions, distances):
+    """Return the final position and total zeros passed through using NumPy.
 
+    Tracking the unwrapped position (DIAL_START plus running sum of signed
+    distances), the zeros passed during a rotation are the multiples of
+    DIAL_SIZE in (prev, raw] when turning right and in [raw, prev) when
+    turning left, which floor division counts for all rotations at once.
+    """
+    steps = np.where(directions == 1, distances, -distances).astype(np.int64)
+    raw = DIAL_START + np.cumsum(steps)
+    prev = raw - steps
+    zeros = np.where(steps >= 0,
+                     raw // DIAL_SIZE - prev // DIAL_SIZE,
+                     (prev - 1) // DIAL_SIZE - (raw - 1) // DIAL_SIZE)
+    final_position = int((DIAL_START + steps.sum()) % DIAL_SIZE)
+    return final_position, int(zeros.sum())
 
-async def apply_rotation(dut, direction, distance):
-    """Apply a single rotation."""
-    dut.direction_i.value = 0 if direction == 'L' else 1
-    dut.distance_i.value = distance
-    await RisingEdge(dut.clk_i)
-    await Timer(1, unit="ns")
+
+async def reset_dut(dut):
+    """Apply reset to the DUT."""
+    dut.ctrl_i.value = CTRL_RST
+    await RisingEdge(dut.clk)
+    dut.ctrl_i.value = 0
+    await RisingEdge(dut.clk)
+
+
+async def stream_rotations(dut, words):
+    """Preload all rotations into the wrapper memory and apply them in one burst."""
+    rotations_mem = dut.rotations_mem
+    for i in range(len(words)):
+        rotations_mem[i].value = words[i]
+    dut.count_i.value = len(words)
+    dut.ctrl_i.value = CTRL_START
+    await RisingEdge(dut.clk)
+    dut.ctrl_i.value = 0
+    await RisingEdge(dut.done_o)
+    await ReadOnly()
+
+
+async def replay_prefix(dut, words, count):
+    """Reset the DUT, stream the first count rotations and return its state."""
+    # Leave the read-only phase of any previous read before driving reset
+    await RisingEdge(dut.clk)
+    await reset_dut(dut)
+    await stream_rotations(dut, words[:count])
+    return int(dut.inst_safe_dial_v2.position_q.value), int(dut.zero_count_o.value)
+
+
+async def find_divergence(dut, words, expected_positions, expected_zeros):
+    """Bisect for a rotation after which the RTL first disagrees with the model.
+
+    Called only once the final state is known to mismatch. Each probe replays
+    a prefix of the rotations, so locating the failure costs O(log N) reads
+    instead of reading the RTL state after every rotation. The last rotation
+    is never probed, so callers must check the returned rotation themselves.
+    """
+    # Invariant: state after rotation lo-1 matches, state after rotation hi does not
+    lo, hi = 0, len(expected_positions) - 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        rtl_position, rtl_zeros = await replay_prefix(dut, words, mid + 1)
+        if rtl_position == expected_positions[mid] and rtl_zeros == expected_zeros[mid]:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
 
 
 @cocotb.test()
 async def test_input_file(dut):
     """Test with input.txt file and verify zero count."""
-    
-    clock = Clock(dut.clk_i, 10, units="ns")
-    cocotb.start_soon(clock.start())
-    
     # Reset
-    dut.rst_i.value = 1
-    dut.direction_i.value = 0
-    dut.distance_i.value = 0
-    await RisingEdge(dut.clk_i)
-    await Timer(1, unit="ns")
-    dut.rst_i.value = 0
-    await RisingEdge(dut.clk_i)
-    await Timer(1, unit="ns")
+    await reset_dut(dut)
     
     # Load rotations
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    input_file = os.path.join(script_dir, "input.txt")
+    directions, distances = parse_rotations(INPUT_FILE)
+    words = pack_rotations(directions, distances)
+    num_rotations = len(words)
     
-    rotations = []
-    with open(input_file, "r") as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                direction = line[0]
-                distance = int(line[1:])
-                rotations.append((direction, distance))
+    dut._log.info(f"Loaded {num_rotations} rotations from input.txt")
     
-    dut._log.info(f"Loaded {len(rotations)} rotations from input.txt")
-    
-    # Track state
-    py_position = 50
-    py_zeros = 0
-    
-    # Process rotations
-    for i, (direction, distance) in enumerate(rotations):
-        # Calculate Python expected values
-        zeros_this_rotation = count_zeros_during_rotation(py_position, direction, distance)
-        py_zeros += zeros_this_rotation
-        new_py_position = calculate_position(py_position, direction, distance)
+    if DEBUG_ROTATIONS:
+        # Calculate Python expected values for every rotation up front
+        direction_list = directions.tolist()
+        distance_list = distances.tolist()
+        full_turns, reduced_distances = np.divmod(distances, DIAL_SIZE)
+        expected_positions, expected_zeros = run_reference(
+            direction_list, full_turns.tolist(), reduced_distances.tolist())
+        
+        # Process rotations one at a time, reading RTL state only at the end
+        log_progress = dut._log.isEnabledFor(logging.INFO)
+        progress_lines = []
+        # Resolve handles and the trigger once rather than every iteration
+        clk_edge = RisingEdge(dut.clk)
+        ctrl_sig = dut.ctrl_i
+        for i in range(num_rotations):
+            ctrl_sig.value = words[i]
+            await clk_edge
+            
+            # Progress indicator, buffered and emitted once after the loop
+            if log_progress and (i + 1) % 500 == 0:
+                progress_lines.append(f"Progress: {i+1}/{num_rotations}, py_zeros={expected_zeros[i]}")
         
-        # Apply rotation to RTL
-        await apply_rotation(dut, direction, distance)
+        if progress_lines:
+            dut._log.info("\n".join(progress_lines))
         
-        # Read RTL values
-        rtl_position = int(dut.position_q.value)
+        # Let the last rotation settle; values are stable in the read-only phase
+        await ReadOnly()
+        py_position = expected_positions[-1]
+        py_zeros = expected_zeros[-1]
+        rtl_position = int(dut.inst_safe_dial_v2.position_q.value)
         rtl_zeros = int(dut.zero_count_o.value)
         
-        # Check for discrepancies
-        if rtl_position != new_py_position or rtl_zeros != py_zeros:
-            dut._log.error(f"\n=== DISCREPANCY FOUND at rotation {i+1} ===")
-            dut._log.error(f"Rotation: {direction}{distance} from position {py_position}")
-            dut._log.error(f"  Python: zeros_this={zeros_this_rotation}, new_pos={new_py_position}, total_zeros={py_zeros}")
-            dut._log.error(f"  RTL:    new_pos={rtl_position}, total_zeros={rtl_zeros}")
-            dut._log.error(f"  Position diff: {rtl_position - new_py_position}")
-            dut._log.error(f"  Zeros diff: {rtl_zeros - py_zeros}")
+        if rtl_position == py_position and rtl_zeros == py_zeros:
+            dut._log.info("\n".join([
+                f"\n=== ALL ROTATIONS PROCESSED ===",
+                f"  Python: position={py_position}, zeros={py_zeros}",
+                f"  RTL:    position={rtl_position}, zeros={rtl_zeros}",
+            ]))
+        else:
+            # Locate the failing rotation by replaying prefixes. This is only a
+            # diagnostic: the replay streams rotations from rotations_mem, not
+            # through ctrl_i, so it may not reproduce the failure.
+            i = await find_divergence(dut, words, expected_positions, expected_zeros)
+            replay_position, replay_zeros = await replay_prefix(dut, words, i + 1)
             
-            # Show previous few rotations for context
-            if i >= 3:
-                dut._log.info(f"\nPrevious rotations:")
-                for j in range(max(0, i-3), i):
-                    d, dist = rotations[j]
-                    dut._log.info(f"  {j+1}: {d}{dist}")
+            prev_py_position = expected_positions[i - 1] if i > 0 else DIAL_START
+            new_py_position = expected_positions[i]
+            new_py_zeros = expected_zeros[i]
+            zeros_this_rotation = new_py_zeros - (expected_zeros[i - 1] if i > 0 else 0)
             
-            break
-        
-        # Update Python state
-        py_position = new_py_position
+            if replay_position == new_py_position and replay_zeros == new_py_zeros:
+                dut._log.error("\n".join([
+                    f"\n=== DISCREPANCY FOUND after all rotations ===",
+                    f"  Python: position={py_position}, zeros={py_zeros}",
+                    f"  RTL:    position={rtl_position}, zeros={rtl_zeros}",
+                    f"  Streamed replay matches the model; the failure is in the per-rotation ctrl_i path",
+                ]))
+            else:
+                dut._log.error("\n".join([
+                    f"\n=== DISCREPANCY FOUND at rotation {i+1} ===",
+                    f"Rotation: {'LR'[direction_list[i]]}{distance_list[i]} from position {prev_py_position}",
+                    f"  Python: zeros_this={zeros_this_rotation}, new_pos={new_py_position}, total_zeros={new_py_zeros}",
+                    f"  RTL:    new_pos={replay_position}, total_zeros={replay_zeros}",
+                    f"  Position diff: {replay_position - new_py_position}",
+                    f"  Zeros diff: {replay_zeros - new_py_zeros}",
+                ]))
+                
+                # Show previous few rotations for context
+                if i >= 3:
+                    dut._log.info("\n".join([f"\nPrevious rotations:"] + [
+                        f"  {j+1}: {'LR'[direction_list[j]]}{distance_list[j]}" for j in range(max(0, i-3), i)
+                    ]))
         
-        # Progress indicator
-        if (i + 1) % 500 == 0:
-            dut._log.info(f"Progress: {i+1}/{len(rotations)}, py_zeros={py_zeros}, rtl_zeros={rtl_zeros}")
+        assert rtl_position == py_position, \
+            f"Position mismatch: RTL={rtl_position}, Python={py_position}"
+        assert rtl_zeros == py_zeros, \
+            f"Zero count mismatch: RTL={rtl_zeros}, Python={py_zeros}"
     else:
-        dut._log.info(f"\n=== ALL ROTATIONS PROCESSED ===")
-        dut._log.info(f"  Python: position={py_position}, zeros={py_zeros}")
-        dut._log.info(f"  RTL:    position={rtl_position}, zeros={rtl_zeros}")
+        # Calculate expected result, then stream all rotations in one burst
+        py_position, py_zeros = reference_model(directions, distances)
+        
+        await stream_rotations(dut, words)
+        
+        rtl_position = int(dut.inst_safe_dial_v2.position_q.value)
+        rtl_zeros = int(dut.zero_count_o.value)
+        
+        dut._log.info("\n".join([
+            f"\n=== ALL ROTATIONS PROCESSED ===",
+            f"  Python: position={py_position}, zeros={py_zeros}",
+            f"  RTL:    position={rtl_position}, zeros={rtl_zeros}",
+        ]))
+        
+        assert rtl_position == py_position, \
+            f"Position mismatch: RTL={rtl_position}, Python={py_position}"
+        assert rtl_zeros == py_zeros, \
+            f"Zero count mismatch: RTL={rtl_zeros}, Python={py_zeros}"
@@ -0,0 +1,98 @@
+"""
+Plain pytest checks of the safe_dial_v2 Python reference models (no simulator).
+
+reference_model counts zeros with floor division and run_reference with
+ZEROS_LUT; these tests compare both against count_zeros_during_rotation and a
+click-by-click walk of the dial, so a model bug shows up here rather than as
+an RTL mismatch.
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from test_safe_dial_v2 import (DIAL_SIZE, DIAL_START, INPUT_FILE,
+                               count_zeros_during_rotation, parse_rotations,
+                               reference_model, run_reference)
+
+# Hand-picked sequences: distance 0, multiples of DIAL_SIZE, and rotations
+# that start from position 0 (L50 lands on 0 from DIAL_START)
+EDGE_CASES = [
+    [(0, 0)],
+    [(1, 0), (0, 0)],
+    [(0, 50)],
+    [(0, 50), (1, 0), (0, 0)],
+    [(0, 50), (1, 100), (0, 200)],
+    [(0, 50), (1, 1), (0, 1), (0, 99)],
+    [(1, 50), (1, 250), (0, 1000)],
+    [(1, 100), (0, 300), (1, 49), (1, 1)],
+]
+
+
+def walk_model(directions, distances):
+    """Turn the dial one click at a time, returning per-rotation positions and zeros."""
+    positions = []
+    zero_counts = []
+    position = DIAL_START
+    zeros = 0
+    for direction, distance in zip(directions, distances):
+        step = 1 if direction == 1 else -1
+        for _ in range(distance):
+            position = (position + step) % DIAL_SIZE
+            zeros += position == 0
+        positions.append(position)
+        zero_counts.append(zeros)
+    return positions, zero_counts
+
+
+def scalar_model(directions, distances):
+    """Sum count_zeros_during_rotation over the rotations."""
+    position = DIAL_START
+    zeros = 0
+    for direction, distance in zip(directions, distances):
+        zeros += count_zeros_during_rotation(position, direction, distance)
+        step = distance if direction == 1 else -distance
+        position = (position + step) % DIAL_SIZE
+    return position, zeros
+
+
+def random_rotations(rng, count):
+    """Draw rotations biased towards 0 and multiples of DIAL_SIZE."""
+    return [(rng.randint(0, 1),
+             rng.choice([0, DIAL_SIZE * rng.randint(1, 5),
+                         rng.randint(1, DIAL_SIZE - 1), rng.randint(0, 1000)]))
+            for _ in range(count)]
+
+
+def check_models(rotations):
+    directions = [direction for direction, _ in rotations]
+    distances = [distance for _, distance in rotations]
+    positions, zero_counts = walk_model(directions, distances)
+    assert scalar_model(directions, distances) == (positions[-1], zero_counts[-1])
+    full_turns, reduced_distances = np.divmod(np.array(distances), DIAL_SIZE)
+    assert run_reference(directions, full_turns.tolist(),
+                         reduced_distances.tolist()) == (positions, zero_counts)
+    assert reference_model(np.array(directions, dtype=np.int8),
+                           np.array(distances, dtype=np.int32)) == (positions[-1], zero_counts[-1])
+
+
+@pytest.mark.parametrize("rotations", EDGE_CASES)
+def test_edge_cases(rotations):
+    check_models(rotations)
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_random_rotations(seed):
+    rng = random.Random(seed)
+    check_models(random_rotations(rng, rng.randint(1, 200)))
+
+
+def test_input_file():
+    directions, distances = parse_rotations(INPUT_FILE)
+    full_turns, reduced_distances = np.divmod(distances, DIAL_SIZE)
+    positions, zero_counts = run_reference(directions.tolist(), full_turns.tolist(),
+                                           reduced_distances.tolist())
+    expected = scalar_model(directions.tolist(), distances.tolist())
+    assert (positions[-1], zero_counts[-1]) == expected
+    assert reference_model(directions, distances) == expected == (47, 6892)
@@ -0,0 +1,63 @@
+"""
+Pytest runner for the safe_dial_v2 cocotb testbench.
+
+Each parametrized case builds and simulates in its own build directory, so
+simulator outputs (transcript, vsim.wlf, modelsim.ini) never collide and the
+cases can be spread across cores with pytest-xdist:
+
+    pytest -n auto test_safe_dial_v2_runner.py
+
+Running "pytest -n auto" from the repo root collects the runners of both
+testbenches (see pytest.ini), so they also run in parallel with each other.
+
+SIM defaults to "questa", the Python runner's Questa flow. The Makefile's
+"questa-compat" names a Makefile-only flow that get_runner() does not
+provide; both drive the same vsim installation. Like the Makefile, the
+runner puts QUESTA_BIN on PATH and sets SALT_LICENSE_SERVER; export either
+to override the defaults.
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+from cocotb_tools.runner import get_runner
+
+SIM_DIR = Path(__file__).resolve().parent
+RTL_DIR = SIM_DIR.parent / "rtl"
+
+SOURCES = [
+    SIM_DIR / "tb_safe_dial_v2.sv",
+    RTL_DIR / "safe_dial_v2.sv",
+    RTL_DIR / "mod_barrett.sv",
+]
+
+# QuestaSim setup, matching the Makefile. Set in os.environ rather than
+# extra_env, so the runner itself finds vlog/vsim, not just the subprocesses.
+QUESTA_BIN = os.environ.get("QUESTA_BIN", "/home/ubuntu/questasim/linux_aarch64")
+os.environ.setdefault("SALT_LICENSE_SERVER", "29000@172.31.40.95")
+if QUESTA_BIN not in os.environ.get("PATH", "").split(os.pathsep):
+    os.environ["PATH"] = QUESTA_BIN + os.pathsep + os.environ.get("PATH", "")
+
+
+@pytest.mark.parametrize("debug_rotations", ["0", "1"], ids=["streamed", "debug"])
+@pytest.mark.parametrize("testcase", ["test_input_file"])
+def test_safe_dial_v2(testcase: str, debug_rotations: str):
+    """Build and run one cocotb testcase in an isolated build directory."""
+    runner = get_runner(os.environ.get("SIM", "questa"))
+    build_dir = SIM_DIR / "sim_build" / f"{testcase}_{debug_rotations}"
+
+    runner.build(
+        sources=SOURCES,
+        hdl_toplevel="tb_safe_dial_v2",
+        build_dir=build_dir,
+        always=True,
+    )
+    runner.test(
+        hdl_toplevel="tb_safe_dial_v2",
+        test_module="test_safe_dial_v2",
+        testcase=testcase,
+        build_dir=build_dir,
+        extra_env={"DEBUG_ROTATIONS": debug_rotations},
+        waves=os.environ.get("WAVES", os.environ.get("COCOTB_DUMP_INPUT", "0")) == "1",
+    )